@@ -0,0 +1,248 @@
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from friend_chatbot import AIFriend
+from tracing import Tracer
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "chat_memory.txt")
+STAGES = ['perceive_input', 'update_emotional_state', 'learn_from_interaction', 'select_response']
+
+
+def load_corpus(path):
+    """Read one message per non-empty line"""
+    with open(path, 'r') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def summarize(samples):
+    """Latency summary in milliseconds"""
+    values = sorted(sample * 1000 for sample in samples)
+    if not values:
+        return {'count': 0}
+    return {
+        'count': len(values),
+        'mean_ms': statistics.fmean(values),
+        'p50_ms': percentile(values, 0.50),
+        'p90_ms': percentile(values, 0.90),
+        'p99_ms': percentile(values, 0.99),
+        'max_ms': values[-1]
+    }
+
+
+def git_commit():
+    """Current commit hash, if the benchmark runs inside a git checkout"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class RecordingTracer(Tracer):
+    """Tracer that also keeps every finished trace for later analysis"""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def finish(self, record):
+        super().finish(record)
+        self.records.append(record)
+
+
+def collect_timings(records):
+    """Per-stage and total durations in seconds from recorded traces"""
+    timings = {stage: [] for stage in STAGES + ['total']}
+    for record in records:
+        timings['total'].append(record['duration_ms'] / 1000)
+        for span in record['spans']:
+            if span['name'] in timings:
+                timings[span['name']].append(span['duration_ms'] / 1000)
+    return timings
+
+
+def measure_memory_io(friend, memory_file, processed):
+    """Time save_memory and load_memory against the memory file"""
+    start = time.perf_counter()
+    friend.save_memory()
+    save_seconds = time.perf_counter() - start
+
+    # Build the friend without restoring so only load_memory is timed
+    reloaded = AIFriend(memory_file=memory_file, restore_memory=False)
+    start = time.perf_counter()
+    reloaded.load_memory()
+    load_seconds = time.perf_counter() - start
+    reloaded.memory_store.close()
+
+    size = sum(
+        os.path.getsize(memory_file + suffix)
+        for suffix in ('', '-wal')
+        if os.path.exists(memory_file + suffix)
+    )
+    return {
+        'messages': processed,
+        'memory_bytes': size,
+        'save_ms': save_seconds * 1000,
+        'load_ms': load_seconds * 1000
+    }
+
+
+def measure_untraced(messages, memory_file):
+    """Per-message latency without a tracer, as a baseline for tracing overhead
+
+    Span bookkeeping and the cache_info calls made for span attributes are
+    counted inside every traced stage; comparing this against the traced
+    total shows how much of it the tracer itself costs.
+    """
+    friend = AIFriend(memory_file=memory_file)
+    friend.autoflush = False
+    samples = []
+    try:
+        for message in messages:
+            start = time.perf_counter()
+            friend.generate_response(message)
+            samples.append(time.perf_counter() - start)
+    finally:
+        friend.memory_store.close()
+    return samples
+
+
+def measure_allocations(messages, memory_file):
+    """Per-message allocation peak and net block growth, traced separately from timing"""
+    friend = AIFriend(memory_file=memory_file)
+    friend.autoflush = False
+    peaks, blocks = [], []
+    tracemalloc.start()
+    try:
+        for message in messages:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            blocks_before = sys.getallocatedblocks()
+            friend.generate_response(message)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+            blocks.append(sys.getallocatedblocks() - blocks_before)
+    finally:
+        tracemalloc.stop()
+        friend.memory_store.close()
+    return {
+        'peak_bytes_mean': statistics.fmean(peaks) if peaks else 0.0,
+        'peak_bytes_max': max(peaks, default=0),
+        'net_blocks_mean': statistics.fmean(blocks) if blocks else 0.0
+    }
+
+
+def run_benchmark(corpus_path=DEFAULT_CORPUS, repeat=20, seed=0, checkpoint=50):
+    """Replay a corpus through AIFriend and collect latency and memory figures"""
+    corpus = load_corpus(corpus_path)
+    messages = corpus * repeat
+    random.seed(seed)
+
+    tracer = RecordingTracer()
+    memory_io = []
+
+    with tempfile.TemporaryDirectory() as workdir:
+        memory_file = os.path.join(workdir, "ai_memory.db")
+        friend = AIFriend(memory_file=memory_file, tracer=tracer)
+        # Leave changes pending between checkpoints so save_ms times a real flush
+        friend.autoflush = False
+        for processed, message in enumerate(messages, 1):
+            friend.generate_response(message)
+            if processed % checkpoint == 0 or processed == len(messages):
+                memory_io.append(measure_memory_io(friend, memory_file, processed))
+        friend.memory_store.close()
+        # ru_maxrss is reported in kilobytes on Linux; read it before
+        # tracemalloc adds its own bookkeeping to the process
+        peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        random.seed(seed)
+        untraced = measure_untraced(messages, os.path.join(workdir, "untraced_memory.db"))
+
+        random.seed(seed)
+        allocations = measure_allocations(
+            messages, os.path.join(workdir, "alloc_memory.db")
+        )
+
+    stages = {
+        stage: summarize(samples) for stage, samples in collect_timings(tracer.records).items()
+    }
+    untraced_total = summarize(untraced)
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'corpus': os.path.basename(corpus_path),
+            'messages': len(messages),
+            'seed': seed
+        },
+        # Stage timings include the tracer's own overhead; see tracer_overhead
+        'stages': stages,
+        'tracer_overhead': {
+            'untraced_total': untraced_total,
+            'mean_ms': stages['total'].get('mean_ms', 0.0) - untraced_total.get('mean_ms', 0.0)
+        },
+        'memory_io': memory_io,
+        'peak_rss_kb': peak_rss_kb,
+        'allocations_per_message': allocations
+    }
+
+
+def compare(baseline, current):
+    """Ratio of current to baseline mean and p99 latency per stage"""
+    ratios = {}
+    for stage, summary in current['stages'].items():
+        before = baseline.get('stages', {}).get(stage)
+        if not before or not before.get('count'):
+            continue
+        ratios[stage] = {
+            key: summary[key] / before[key] if before[key] else None
+            for key in ('mean_ms', 'p99_ms')
+        }
+    return ratios
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the AIFriend response pipeline")
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS, help="one message per line")
+    parser.add_argument('--repeat', type=int, default=20, help="times to replay the corpus")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--checkpoint', type=int, default=50,
+                        help="measure save/load every N messages")
+    parser.add_argument('--output', help="write results to this JSON file")
+    parser.add_argument('--baseline', help="earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.corpus, args.repeat, args.seed, args.checkpoint)
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            results['comparison'] = compare(json.load(f), results)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import re
+from collections import deque
+
+
+class ConversationIndex:
+    """Fixed-size ring buffer of conversation entries with inverted indexes
+
+    Entries are indexed by keyword, topic and hourly time bucket. Because
+    entries are evicted oldest first, every posting list is ordered by
+    sequence number and eviction only ever pops from the left.
+    """
+
+    def __init__(self, capacity=100):
+        self.capacity = capacity
+        self._slots = [None] * capacity
+        self._next_seq = 0
+        self.keyword_index = {}
+        self.topic_index = {}
+        self.time_index = {}
+
+    @staticmethod
+    def time_bucket(timestamp):
+        """Hourly bucket for an ISO timestamp, e.g. '2025-03-28T16'"""
+        return timestamp[:13]
+
+    @staticmethod
+    def extract_keywords(text):
+        """Fallback keyword extraction for entries without perceived words"""
+        return re.findall(r"\w+", text.lower())
+
+    @property
+    def first_seq(self):
+        return max(0, self._next_seq - self.capacity)
+
+    @property
+    def last_seq(self):
+        return self._next_seq - 1
+
+    def __len__(self):
+        return self._next_seq - self.first_seq
+
+    def __iter__(self):
+        for seq in range(self.first_seq, self._next_seq):
+            yield self._slots[seq % self.capacity]['entry']
+
+    def _postings(self, record):
+        yield self.keyword_index, record['keywords']
+        yield self.topic_index, record['topics']
+        yield self.time_index, (record['bucket'],)
+
+    def append(self, entry, keywords=None):
+        """Add an entry, evicting the oldest one if the buffer is full"""
+        if keywords is None:
+            keywords = self.extract_keywords(entry['user_input'])
+        seq = self._next_seq
+        slot = seq % self.capacity
+
+        # Drop the evicted entry from every index it appears in
+        evicted = self._slots[slot]
+        if evicted is not None:
+            for index, keys in self._postings(evicted):
+                for key in keys:
+                    postings = index[key]
+                    postings.popleft()
+                    if not postings:
+                        del index[key]
+
+        record = {
+            'entry': entry,
+            'keywords': frozenset(w for w in keywords if re.match(r"\w", w)),
+            'topics': frozenset(entry.get('topics', [])),
+            'bucket': self.time_bucket(entry.get('timestamp', ''))
+        }
+        self._slots[slot] = record
+        for index, keys in self._postings(record):
+            for key in keys:
+                index.setdefault(key, deque()).append(seq)
+
+        self._next_seq += 1
+        return seq
+
+    def recall(self, keyword=None, topic=None, bucket=None, before=None, limit=5):
+        """Find the most recent entries matching every given filter"""
+        filters = []
+        if keyword is not None:
+            filters.append((self.keyword_index, 'keywords', keyword))
+        if topic is not None:
+            filters.append((self.topic_index, 'topics', topic))
+        if bucket is not None:
+            filters.append((self.time_index, 'bucket', bucket))
+        if not filters:
+            return []
+
+        # Walk the shortest posting list and check the rest per entry
+        postings = []
+        for index, field, key in filters:
+            if key not in index:
+                return []
+            postings.append((len(index[key]), index[key]))
+        postings.sort(key=lambda item: item[0])
+        candidates = postings[0][1]
+
+        results = []
+        for seq in reversed(candidates):
+            if before is not None and seq >= before:
+                continue
+            record = self._slots[seq % self.capacity]
+            if all(
+                record[field] == key if field == 'bucket' else key in record[field]
+                for _, field, key in filters
+            ):
+                results.append(record['entry'])
+                if len(results) >= limit:
+                    break
+        return results
@@ -1,12 +1,25 @@
 import random
+import argparse
 import datetime
+import functools
 import json
 import os
-from collections import defaultdict
+import sys
 import re
+import threading
+import time
+from collections import Counter
 import nltk
 from nltk.tokenize import word_tokenize
 from nltk.corpus import stopwords
+from memory_store import MemoryStore, ScoreTable
+from conversation_index import ConversationIndex
+from heavy_hitters import DecayedSpaceSaving
+from fuzzy_match import DeletionIndex
+from lemmatizer import LemmaNormalizer, is_known_word
+from latency_budget import UNLIMITED, BackgroundLearner, CostEstimator, LatencyBudget
+from lexicon import LexiconEngine, default_sentiment_weights, topic_weights_from_knowledge_base
+from tracing import NULL_TRACER, Tracer
 try:
     nltk.data.find('tokenizers/punkt')
 except LookupError:
@@ -14,9 +27,21 @@ except LookupError:
     nltk.download('stopwords')
 
 class AIFriend:
-    def __init__(self, name="Alex"):
+    def __init__(self, name="Alex", user_id="default", lexicon_file=None, max_edit_distance=1,
+                 memory_file="ai_memory.db", tracer=None, latency_budget_ms=None,
+                 restore_memory=True):
         # Core identity
         self.name = name
+        self.user_id = user_id
+        
+        # Opt-in per-stage tracing; the null tracer makes every span a no-op
+        self.tracer = tracer or NULL_TRACER
+        
+        # Per-request latency budget and the cheaper paths taken to meet it
+        self.latency_budget_ms = latency_budget_ms
+        self.cost_estimator = CostEstimator()
+        self.background_learner = BackgroundLearner(max_pending=100)
+        self.degradations = Counter()
         self.personality_traits = {
             'openness': 0.8,
             'curiosity': 0.9,
@@ -35,11 +60,26 @@ class AIFriend:
         }
         
         # Memory and Learning
-        self.conversation_history = []
-        self.learned_topics = defaultdict(float)
-        self.user_preferences = defaultdict(float)
-        self.topic_expertise = defaultdict(float)
-        self.memory_file = "ai_memory.json"
+        self.conversation_history = ConversationIndex(capacity=100)
+        self.memory_file = memory_file
+        self.legacy_memory_file = os.path.join(os.path.dirname(memory_file), "ai_memory.json")
+        self.memory_store = MemoryStore(self.memory_file, user_id=self.user_id)
+        # Topic scores are read from the store only when a turn touches them
+        self.learned_topics = ScoreTable(
+            loader=lambda topic: self.memory_store.get_topic_score(topic, 'learned')
+        )
+        self.user_preferences = DecayedSpaceSaving(capacity=200)
+        self.topic_expertise = ScoreTable(
+            loader=lambda topic: self.memory_store.get_topic_score(topic, 'expertise')
+        )
+        self.pending_history = []
+        # Commit memory after every turn; batch modes flush at checkpoints instead
+        self.autoflush = True
+        # Guards learned state shared with deferred learning
+        self._memory_lock = threading.RLock()
+        # Serializes store commits, which run outside the memory lock
+        self._store_lock = threading.Lock()
+        self.stop_words = frozenset(stopwords.words('english'))
         
         # Goals and Motivations
         self.current_goals = {
@@ -50,7 +90,8 @@ class AIFriend:
         }
         
         # Load previous learning
-        self.load_memory()
+        if restore_memory:
+            self.load_memory()
         
         # Enhanced Knowledge Base
         self.knowledge_base = {
@@ -68,6 +109,16 @@ class AIFriend:
             }
         }
         
+        # Sentiment and topic lexicon, built once from the knowledge base
+        if lexicon_file:
+            self.lexicon = LexiconEngine.from_file(lexicon_file, self.knowledge_base)
+        else:
+            self.lexicon = LexiconEngine(
+                default_sentiment_weights(),
+                topic_weights_from_knowledge_base(self.knowledge_base)
+            )
+        self.normalizer = LemmaNormalizer(self.lexicon.vocabulary)
+        
         # Conversation Patterns
         self.conversation_patterns = {
             'greeting': ['hello', 'hi', 'hey', 'good morning', 'good evening'],
@@ -76,17 +127,46 @@ class AIFriend:
             'confusion': ['what', 'how', 'why', 'don\'t understand'],
             'favorites': ['favorite', 'favourite', 'best', 'like most']
         }
+        self.pattern_words = {
+            word
+            for phrases in self.conversation_patterns.values()
+            for phrase in phrases
+            for word in phrase.split()
+        }
+        
+        # Typo-tolerant lookup over favorites and topic nouns; words that are
+        # real words in their own right ("takes", "login") are left alone
+        vocabulary = list(self.conversation_patterns['favorites'])
+        for category, subtopics in self.knowledge_base.items():
+            vocabulary.append(category)
+            vocabulary.extend(subtopics)
+        self.fuzzy_index = DeletionIndex(
+            vocabulary,
+            max_distance=max_edit_distance,
+            is_known=lambda token: token in self.pattern_words or is_known_word(token)
+        )
     
-    def perceive_input(self, user_input):
+    def tokenize_words(self, text, fast_tokenize=False):
+        """Split text into tokens and the non-stopword words among them"""
+        # The regex tokenizer is the cheap fallback for NLTK's
+        if fast_tokenize:
+            tokens = re.findall(r"\w+(?:'\w+)?|[^\w\s]", text.lower())
+        else:
+            tokens = word_tokenize(text.lower())
+        words = [w for w in tokens if w not in self.stop_words]
+        return tokens, words
+    
+    def perceive_input(self, user_input, fast_tokenize=False):
         """Analyze and understand user input"""
         # Tokenize and process input
-        tokens = word_tokenize(user_input.lower())
-        words = [w for w in tokens if w not in stopwords.words('english')]
+        tokens, words = self.tokenize_words(user_input, fast_tokenize)
+        
+        matched, sentiment_words, topic_words = self.normalize_words(words)
         
         # Analyze sentiment and context
-        sentiment = self.analyze_sentiment(words)
-        topics = self.identify_topics(words)
-        intent = self.identify_intent(words)
+        sentiment = self.analyze_sentiment(sentiment_words)
+        topics = self.identify_topics(topic_words)
+        intent = self.identify_intent(matched)
         
         return {
             'tokens': tokens,
@@ -96,27 +176,40 @@ class AIFriend:
             'intent': intent
         }
     
+    def normalize_words(self, words):
+        """Spelling-corrected words, plus the lemmatized forms used for sentiment and topics"""
+        # Correct near-miss spellings of known pattern and topic words
+        matched = [self.fuzzy_index.correct(w) for w in words]
+        # Match the lexicons on lemmas, so "loved" counts as "love"
+        sentiment_words = [self.normalizer.normalize(w) for w in words]
+        topic_words = [self.normalizer.normalize(w) for w in matched]
+        return matched, sentiment_words, topic_words
+    
     def analyze_sentiment(self, words):
         """Analyze the emotional content of words"""
-        positive_words = set(['happy', 'good', 'great', 'awesome', 'excellent', 'love', 'wonderful'])
-        negative_words = set(['sad', 'bad', 'terrible', 'awful', 'hate', 'dislike', 'wrong'])
-        
-        sentiment = 0
-        for word in words:
-            if word in positive_words:
-                sentiment += 0.1
-            elif word in negative_words:
-                sentiment -= 0.1
-        
-        return max(-1.0, min(1.0, sentiment))
+        return self.lexicon.sentiment(words)
     
     def identify_topics(self, words):
         """Identify topics in the conversation"""
-        topics = []
-        for category, subtopics in self.knowledge_base.items():
-            if category in words or any(topic in words for topic in subtopics):
-                topics.append(category)
-        return topics
+        return self.lexicon.topics_for(words)
+    
+    def analyze_batch(self, messages):
+        """Score sentiment and topics for many messages at once"""
+        sentiment_batch, topic_batch = [], []
+        for message in messages:
+            _, words = self.tokenize_words(message)
+            _, sentiment_words, topic_words = self.normalize_words(words)
+            sentiment_batch.append(sentiment_words)
+            topic_batch.append(topic_words)
+        
+        sentiments, affinities = self.lexicon.score_batch(sentiment_batch, topic_batch)
+        return [
+            {
+                'sentiment': float(sentiment),
+                'topics': self.lexicon.topics_from_affinities(affinity)
+            }
+            for sentiment, affinity in zip(sentiments, affinities)
+        ]
     
     def identify_intent(self, words):
         """Identify user's intent"""
@@ -124,7 +217,7 @@ class AIFriend:
         
         # Check for favorite-related questions
         if any(pattern in text for pattern in self.conversation_patterns['favorites']):
-            for topic in ['food', 'movie', 'book', 'color', 'music', 'hobby']:
+            for topic in self.knowledge_base['favorites']:
                 if topic in text:
                     return f'favorite_{topic}'
         
@@ -154,41 +247,107 @@ class AIFriend:
         for emotion in self.emotional_state:
             self.emotional_state[emotion] = max(0.0, min(1.0, self.emotional_state[emotion]))
     
-    def learn_from_interaction(self, user_input, perception):
+    def learn_from_interaction(self, user_input, perception, learn_preferences=True, flush=True):
         """Learn from the interaction"""
-        # Update topic expertise
-        for topic in perception['topics']:
-            self.topic_expertise[topic] += 0.05
-            self.learned_topics[topic] += 0.1
-        
-        # Learn user preferences
-        for word in perception['words']:
-            if word not in stopwords.words('english'):
-                self.user_preferences[word] += 0.05
-        
-        # Update conversation history
-        self.conversation_history.append({
-            'user_input': user_input,
-            'topics': perception['topics'],
-            'sentiment': perception['sentiment'],
-            'timestamp': datetime.datetime.now().isoformat()
-        })
-        
-        # Trim history if too long
-        if len(self.conversation_history) > 100:
-            self.conversation_history = self.conversation_history[-100:]
-    
-    def generate_response(self, user_input):
-        """Generate a contextual and personalized response"""
-        # Perceive and analyze input
-        perception = self.perceive_input(user_input)
-        
-        # Update internal state
-        self.update_emotional_state(perception)
-        
-        # Learn from interaction
+        with self._memory_lock:
+            # Update topic expertise
+            for topic in perception['topics']:
+                self.topic_expertise[topic] += 0.05
+                self.learned_topics[topic] += 0.1
+            
+            # Learn user preferences
+            if learn_preferences:
+                for word in perception['words']:
+                    if word not in self.stop_words:
+                        self.user_preferences.add(word, 0.05)
+            
+            # Update conversation history
+            entry = {
+                'user_input': user_input,
+                'topics': perception['topics'],
+                'sentiment': perception['sentiment'],
+                'timestamp': datetime.datetime.now().isoformat()
+            }
+            self.conversation_history.append(entry, keywords=perception['words'])
+            self.pending_history.append(entry)
+        
+        # Persist only what changed during this turn
+        if self.autoflush and flush:
+            self.flush_memory()
+    
+    def timed_learn(self, user_input, perception):
+        """Learn from the interaction and feed its cost into the latency estimate"""
+        start = time.perf_counter()
         self.learn_from_interaction(user_input, perception)
+        self.cost_estimator.record('learn_from_interaction', (time.perf_counter() - start) * 1000)
+    
+    def generate_response(self, user_input, budget_ms=None, started_at=None):
+        """Generate a contextual and personalized response
+        
+        With a latency budget, stages whose expected cost no longer fits
+        fall back to cheaper paths, counted in self.degradations.
+        """
+        if budget_ms is None:
+            budget_ms = self.latency_budget_ms
+        budget = UNLIMITED if budget_ms is None else LatencyBudget(budget_ms, started_at)
+        estimator = self.cost_estimator
+        degraded = []
         
+        with self.tracer.trace('generate_response') as trace:
+            # Perceive and analyze input
+            fast_tokenize = not estimator.fits('perceive_input', budget.remaining_ms())
+            if fast_tokenize:
+                degraded.append('regex_tokenizer')
+            with trace.span('perceive_input') as span:
+                if self.tracer.enabled:
+                    cache_before = self.normalizer.cache_info()
+                start = time.perf_counter()
+                perception = self.perceive_input(user_input, fast_tokenize=fast_tokenize)
+                if not fast_tokenize:
+                    estimator.record('perceive_input', (time.perf_counter() - start) * 1000)
+                if self.tracer.enabled:
+                    cache_after = self.normalizer.cache_info()
+                    span.set(
+                        lemma_cache_hits=cache_after.hits - cache_before.hits,
+                        lemma_cache_misses=cache_after.misses - cache_before.misses
+                    )
+            trace.set(intent=perception['intent'], topics=perception['topics'])
+            # Earlier turns are those recorded before this one, even if learning is deferred
+            perception['history_position'] = self.conversation_history.last_seq + 1
+            
+            # Update internal state
+            with trace.span('update_emotional_state'):
+                self.update_emotional_state(perception)
+            
+            # Learn from interaction, deferring it or dropping preferences when short on time.
+            # Once a turn is deferred, later turns queue behind it so history stays in order.
+            with trace.span('learn_from_interaction'):
+                learner = self.background_learner
+                if learner.idle() and estimator.fits('learn_from_interaction',
+                                                     budget.remaining_ms()):
+                    self.timed_learn(user_input, perception)
+                elif learner.submit(self.timed_learn, user_input, perception):
+                    degraded.append('deferred_learning')
+                else:
+                    # The backlog is full: wait for room, queueing only the cheap
+                    # history update and leaving the commit to a later flush
+                    learner.submit(
+                        functools.partial(
+                            self.learn_from_interaction, learn_preferences=False, flush=False
+                        ),
+                        user_input, perception, block=True
+                    )
+                    degraded.append('skipped_preferences')
+            
+            if degraded:
+                self.degradations.update(degraded)
+                trace.set(degraded=degraded)
+            
+            with trace.span('select_response'):
+                return self.select_response(user_input, perception)
+    
+    def select_response(self, user_input, perception):
+        """Pick a response for a perceived input"""
         # Generate response based on intent
         intent = perception['intent']
         
@@ -243,7 +402,9 @@ class AIFriend:
     def generate_topic_response(self, topics):
         """Generate response based on topics"""
         topic = topics[0]
-        if self.topic_expertise[topic] > 0.7:
+        with self._memory_lock:
+            expertise = self.topic_expertise[topic]
+        if expertise > 0.7:
             return f"I find {topic} fascinating! I've learned quite a bit about it. Would you like to discuss any specific aspect?"
         else:
             return f"That's an interesting topic! While I'm still learning about {topic}, I'd love to hear your thoughts on it."
@@ -256,6 +417,14 @@ class AIFriend:
         elif perception['sentiment'] > 0.5:
             return self.generate_positive_response()
         
+        # Bring up something the user said before
+        earlier = self.recall_earlier_mention(
+            perception['words'], before=perception.get('history_position')
+        )
+        if earlier:
+            word, entry = earlier
+            return f"You mentioned {word} before, when you said \"{entry['user_input']}\". Tell me more about that!"
+        
         # Generate response based on current goals
         if self.current_goals['understand_user'] < 0.5:
             return self.generate_curious_response()
@@ -270,6 +439,20 @@ class AIFriend:
             "That's fascinating! How did you come to that conclusion?"
         ])
     
+    def recall_earlier_mention(self, words, before=None):
+        """Find an earlier turn where the user talked about one of these words"""
+        with self._memory_lock:
+            if before is None:
+                before = self.conversation_history.last_seq
+            for word in words:
+                # Only content words are worth bringing up again
+                if not word.isalpha() or len(word) < 4 or word in self.pattern_words:
+                    continue
+                matches = self.conversation_history.recall(keyword=word, before=before, limit=1)
+                if matches:
+                    return word, matches[0]
+        return None
+    
     def generate_empathetic_response(self):
         """Generate an empathetic response"""
         return random.choice([
@@ -312,32 +495,66 @@ class AIFriend:
         else:
             return "evening"
     
-    def save_memory(self):
-        """Save learned information to file"""
-        memory_data = {
-            'learned_topics': dict(self.learned_topics),
-            'user_preferences': dict(self.user_preferences),
-            'topic_expertise': dict(self.topic_expertise),
-            'personality_traits': self.personality_traits,
-            'conversation_history': self.conversation_history[-50:]  # Save last 50 conversations
-        }
+    def update_goals(self):
+        """Advance conversation goals after an exchange"""
+        self.current_goals['understand_user'] += 0.1
+        self.current_goals['be_helpful'] += 0.05
+        self.current_goals['maintain_conversation'] += 0.1
         
-        with open(self.memory_file, 'w') as f:
-            json.dump(memory_data, f)
+        # Normalize goals
+        for goal in self.current_goals:
+            self.current_goals[goal] = max(0.0, min(1.0, self.current_goals[goal]))
+    
+    def flush_memory(self):
+        """Write changes since the last flush to the memory store in one transaction"""
+        with self._memory_lock:
+            preferences, removed_preferences = self.user_preferences.pop_changes()
+            changes = {
+                'preferences': preferences,
+                'removed_preferences': removed_preferences,
+                'meta': {'preference_landmark': self.user_preferences.landmark},
+                'learned_topics': self.learned_topics.pop_changes(),
+                'topic_expertise': self.topic_expertise.pop_changes(),
+                'history': self.pending_history
+            }
+            self.pending_history = []
+            # Take the store lock before releasing the memory lock so
+            # snapshots are committed in the order they were taken
+            self._store_lock.acquire()
+        try:
+            self.memory_store.commit(**changes)
+        finally:
+            self._store_lock.release()
+    
+    def save_memory(self):
+        """Save learned information to the memory store"""
+        # Let deferred learning finish so nothing from this session is lost
+        self.background_learner.drain()
+        self.flush_memory()
+        with self._memory_lock:
+            traits = dict(self.personality_traits)
+        with self._store_lock:
+            self.memory_store.commit(traits=traits)
     
     def load_memory(self):
         """Load previously learned information"""
-        if os.path.exists(self.memory_file):
-            try:
-                with open(self.memory_file, 'r') as f:
-                    memory_data = json.load(f)
-                    self.learned_topics.update(memory_data.get('learned_topics', {}))
-                    self.user_preferences.update(memory_data.get('user_preferences', {}))
-                    self.topic_expertise.update(memory_data.get('topic_expertise', {}))
-                    self.personality_traits.update(memory_data.get('personality_traits', {}))
-                    self.conversation_history.extend(memory_data.get('conversation_history', []))
-            except json.JSONDecodeError:
-                print("Memory file corrupted, starting fresh.")
+        # Migrate the old JSON memory the first time the store is used
+        if self.memory_store.is_empty():
+            self.memory_store.import_json(self.legacy_memory_file)
+        
+        # Keep only as many preferences as the top-k counter tracks
+        capacity = self.user_preferences.capacity
+        self.memory_store.prune_preferences(capacity)
+        self.user_preferences.load(
+            self.memory_store.top_preferences(capacity),
+            landmark=self.memory_store.get_meta('preference_landmark')
+        )
+        
+        self.personality_traits.update(self.memory_store.load_traits())
+        # Index restored turns by the same words live turns are indexed by
+        for entry in self.memory_store.recent_history(self.conversation_history.capacity):
+            _, words = self.tokenize_words(entry['user_input'])
+            self.conversation_history.append(entry, keywords=words)
 
 def chat():
     """Main chat loop"""
@@ -356,17 +573,118 @@ def chat():
             print(f"\n{ai_friend.name}: {response}")
             
             # Update goals based on interaction
-            ai_friend.current_goals['understand_user'] += 0.1
-            ai_friend.current_goals['be_helpful'] += 0.05
-            ai_friend.current_goals['maintain_conversation'] += 0.1
-            
-            # Normalize goals
-            for goal in ai_friend.current_goals:
-                ai_friend.current_goals[goal] = max(0.0, min(1.0, ai_friend.current_goals[goal]))
+            ai_friend.update_goals()
     
     finally:
         # Save learned information before exiting
         ai_friend.save_memory()
 
+def read_messages(stream, fmt='text'):
+    """Yield messages from newline-delimited text or JSONL, one line at a time"""
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        if fmt == 'jsonl':
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                yield {'error': 'invalid JSON', 'line': line}
+                continue
+            if isinstance(record, str):
+                record = {'message': record}
+            elif not isinstance(record, dict):
+                yield {'error': 'expected object', 'line': line}
+                continue
+            yield record
+        else:
+            yield {'message': line}
+
+def respond_stream(ai_friend, records, checkpoint_every=100):
+    """Yield (record, response) pairs, checkpointing memory every N messages"""
+    if checkpoint_every < 1:
+        raise ValueError("checkpoint_every must be at least 1")
+    processed = 0
+    for record in records:
+        message = record.get('message', record.get('text')) if 'error' not in record else None
+        if not isinstance(message, str):
+            yield record, None
+            continue
+        
+        response = ai_friend.generate_response(message)
+        ai_friend.update_goals()
+        yield record, response
+        
+        processed += 1
+        if processed % checkpoint_every == 0:
+            ai_friend.save_memory()
+
+def pipe(input_file=None, output_file=None, fmt='text', checkpoint_every=100, budget_ms=None,
+         trace_file=None):
+    """Run the chatbot as a filter from stdin or a file to stdout or a file"""
+    tracer = Tracer(trace_file) if trace_file else None
+    ai_friend = AIFriend(latency_budget_ms=budget_ms, tracer=tracer)
+    # Checkpoints replace the per-turn commit so memory writes are batched
+    ai_friend.autoflush = False
+    source = open(input_file, 'r') if input_file else sys.stdin
+    sink = open(output_file, 'w') if output_file else sys.stdout
+    
+    try:
+        for count, (record, response) in enumerate(
+                respond_stream(ai_friend, read_messages(source, fmt), checkpoint_every), 1):
+            if fmt == 'jsonl':
+                if response is None:
+                    output = dict(record, error=record.get('error', 'missing message'))
+                else:
+                    output = dict(record, response=response)
+                sink.write(json.dumps(output) + '\n')
+            elif response is not None:
+                sink.write(response + '\n')
+            
+            # Buffered writes are pushed downstream at each checkpoint
+            if count % checkpoint_every == 0:
+                sink.flush()
+        sink.flush()
+    except BrokenPipeError:
+        # The downstream reader went away; stop quietly like other filters
+        sys.stdout = open(os.devnull, 'w')
+    finally:
+        ai_friend.save_memory()
+        ai_friend.tracer.close()
+        if input_file:
+            source.close()
+        if output_file:
+            sink.close()
+
+def positive_int(value):
+    """argparse type for integers of at least 1"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {value}")
+    return number
+
+def main():
+    parser = argparse.ArgumentParser(description="Chat with your AI friend")
+    parser.add_argument('--pipe', action='store_true',
+                        help="read messages non-interactively and write one response per message")
+    parser.add_argument('--input', help="read messages from this file instead of stdin")
+    parser.add_argument('--output', help="write responses to this file instead of stdout")
+    parser.add_argument('--format', choices=['text', 'jsonl'], default='text',
+                        help="one message per line, or JSON objects with a 'message' field")
+    parser.add_argument('--checkpoint', type=positive_int, default=100,
+                        help="save memory every N messages in pipe mode")
+    parser.add_argument('--budget-ms', type=float,
+                        help="per-message latency budget; cheaper paths are used when it runs low")
+    parser.add_argument('--trace-file',
+                        help="append per-stage tracing spans to this JSONL file in pipe mode; "
+                             "latency histograms go to FILE.summary.json")
+    args = parser.parse_args()
+    
+    if args.pipe:
+        pipe(args.input, args.output, args.format, args.checkpoint, args.budget_ms,
+             args.trace_file)
+    else:
+        chat()
+
 if __name__ == "__main__":
-    chat()
+    main()
@@ -0,0 +1,88 @@
+def edit_distance(a, b, limit=None):
+    """Optimal string alignment distance (Levenshtein plus adjacent swaps)"""
+    if limit is not None and abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + cost
+            )
+            if (previous2 is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        previous2, previous = previous, current
+    return previous[len(b)]
+
+
+class DeletionIndex:
+    """SymSpell-style fuzzy lookup over a fixed vocabulary
+
+    Every vocabulary word is indexed under all strings reachable by
+    deleting up to `max_distance` characters. A token is then matched by
+    generating its own deletions and only verifying the few candidates
+    that share one, instead of comparing it against every word.
+
+    Tokens for which `is_known` returns true are real words in their own
+    right and are never corrected.
+    """
+
+    def __init__(self, vocabulary, max_distance=1, min_length=6, is_known=None):
+        self.max_distance = max_distance
+        self.min_length = min_length
+        self.is_known = is_known
+        self.words = {}
+        self.deletes = {}
+        for word in vocabulary:
+            if word in self.words:
+                continue
+            self.words[word] = len(self.words)
+            for variant in self._deletions(word):
+                self.deletes.setdefault(variant, []).append(word)
+
+    def _deletions(self, word):
+        """All strings reachable from word by up to max_distance deletions"""
+        variants = {word}
+        frontier = {word}
+        for _ in range(self.max_distance):
+            frontier = {
+                variant[:i] + variant[i + 1:]
+                for variant in frontier
+                for i in range(len(variant))
+            }
+            variants |= frontier
+        return variants
+
+    def lookup(self, token):
+        """Closest vocabulary word within max_distance, or None"""
+        if token in self.words:
+            return token
+        if len(token) < self.min_length or self.max_distance < 1:
+            return None
+        if self.is_known is not None and self.is_known(token):
+            return None
+
+        best, best_key = None, None
+        seen = set()
+        for variant in self._deletions(token):
+            for word in self.deletes.get(variant, ()):
+                if word in seen:
+                    continue
+                seen.add(word)
+                distance = edit_distance(token, word, self.max_distance)
+                if distance > self.max_distance:
+                    continue
+                key = (distance, self.words[word])
+                if best_key is None or key < best_key:
+                    best, best_key = word, key
+        return best
+
+    def correct(self, token):
+        """Replace a token with its closest vocabulary word if there is one"""
+        match = self.lookup(token)
+        return token if match is None else match
@@ -0,0 +1,113 @@
+import heapq
+import math
+import time
+
+
+class DecayedSpaceSaving:
+    """Space-Saving top-k counter with exponential time decay
+
+    At most `capacity` items are tracked. When a new item arrives and the
+    counter is full, the lowest scoring item is evicted and the newcomer
+    inherits its score, as in the Space-Saving algorithm.
+
+    Decay uses forward decay: weights are stored scaled by
+    exp(rate * (t - landmark)), so older scores never need rewriting and
+    the relative order of items is preserved. Reading a score scales it
+    back to the current time.
+    """
+
+    # Rescale stored weights once they grow past this to stay within float range
+    MAX_RAW_WEIGHT = 1e100
+
+    def __init__(self, capacity=200, half_life=30 * 24 * 3600, clock=time.time, landmark=None):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.rate = math.log(2) / half_life
+        self.clock = clock
+        self.landmark = clock() if landmark is None else landmark
+        self.weights = {}
+        self._heap = []
+        self.dirty = set()
+        self.removed = set()
+
+    def _scale(self, now):
+        return math.exp(self.rate * (now - self.landmark))
+
+    def __len__(self):
+        return len(self.weights)
+
+    def __contains__(self, item):
+        return item in self.weights
+
+    def __getitem__(self, item):
+        """Decayed score of an item as of now, 0.0 if it is not tracked"""
+        raw = self.weights.get(item)
+        if raw is None:
+            return 0.0
+        return raw / self._scale(self.clock())
+
+    def _pop_min(self):
+        # Heap entries go stale when an item is updated; skip those lazily
+        while self._heap:
+            raw, item = heapq.heappop(self._heap)
+            if self.weights.get(item) == raw:
+                return item, raw
+        return None, 0.0
+
+    def _rebuild_heap(self):
+        self._heap = [(raw, item) for item, raw in self.weights.items()]
+        heapq.heapify(self._heap)
+
+    def add(self, item, weight=1.0, now=None):
+        """Add weight to an item, returning the item evicted to make room, if any"""
+        now = self.clock() if now is None else now
+        increment = weight * self._scale(now)
+        evicted = None
+
+        if item in self.weights:
+            raw = self.weights[item] + increment
+        else:
+            raw = increment
+            if len(self.weights) >= self.capacity:
+                evicted, min_raw = self._pop_min()
+                del self.weights[evicted]
+                self.dirty.discard(evicted)
+                self.removed.add(evicted)
+                raw += min_raw
+            self.removed.discard(item)
+
+        self.weights[item] = raw
+        self.dirty.add(item)
+        heapq.heappush(self._heap, (raw, item))
+
+        if len(self._heap) > 4 * self.capacity:
+            self._rebuild_heap()
+        if raw > self.MAX_RAW_WEIGHT:
+            self.rescale(now)
+        return evicted
+
+    def rescale(self, now=None):
+        """Move the landmark to `now` so stored weights return to a small range"""
+        now = self.clock() if now is None else now
+        factor = self._scale(now)
+        self.weights = {item: raw / factor for item, raw in self.weights.items()}
+        self.landmark = now
+        self.dirty.update(self.weights)
+        self._rebuild_heap()
+
+    def load(self, weights, landmark=None):
+        """Restore stored weights, keeping only the top `capacity` of them"""
+        if landmark is not None:
+            self.landmark = landmark
+        best = heapq.nlargest(self.capacity, weights.items(), key=lambda pair: pair[1])
+        self.weights = dict(best)
+        self._rebuild_heap()
+
+    def pop_changes(self):
+        """Return (updated weights, removed items) since the last call"""
+        updated = {item: self.weights[item] for item in self.dirty}
+        removed = set(self.removed)
+        self.dirty.clear()
+        self.removed.clear()
+        return updated, removed
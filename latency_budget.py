@@ -0,0 +1,106 @@
+import queue
+import statistics
+import threading
+import time
+from collections import deque
+
+
+class LatencyBudget:
+    """Deadline for handling one request"""
+
+    def __init__(self, budget_ms, started_at=None):
+        self.started_at = time.perf_counter() if started_at is None else started_at
+        self.deadline = self.started_at + budget_ms / 1000
+
+    def remaining_ms(self):
+        return (self.deadline - time.perf_counter()) * 1000
+
+
+class UnlimitedBudget:
+    """Budget used when no deadline applies; never runs out"""
+
+    def remaining_ms(self):
+        return float('inf')
+
+
+UNLIMITED = UnlimitedBudget()
+
+
+class CostEstimator:
+    """Rolling median of recent stage durations in milliseconds
+
+    The median keeps a single slow sample (a lazy data load, a GC pause)
+    from dominating the estimate. A stage that keeps being skipped because
+    its estimate exceeds the budget is still run every `probe_interval`
+    requests, so a stale estimate gets refreshed.
+    """
+
+    def __init__(self, window=9, probe_interval=10):
+        self.window = window
+        self.probe_interval = probe_interval
+        self.samples = {}
+        self.skipped = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage, duration_ms):
+        with self._lock:
+            self.samples.setdefault(stage, deque(maxlen=self.window)).append(duration_ms)
+
+    def estimate(self, stage):
+        """Expected duration of a stage, 0.0 until it has been measured"""
+        with self._lock:
+            samples = self.samples.get(stage)
+            return statistics.median(samples) if samples else 0.0
+
+    def fits(self, stage, remaining_ms):
+        """Whether to run the full stage with the time that is left"""
+        if remaining_ms >= self.estimate(stage):
+            self.skipped[stage] = 0
+            return True
+        self.skipped[stage] = self.skipped.get(stage, 0) + 1
+        if self.skipped[stage] >= self.probe_interval:
+            # Run the full stage anyway to re-measure it
+            self.skipped[stage] = 0
+            return True
+        return False
+
+
+class BackgroundLearner:
+    """Runs deferred learning work on a single worker thread, in submission order"""
+
+    def __init__(self, max_pending=100):
+        self.tasks = queue.Queue(maxsize=max_pending)
+        self._worker = None
+
+    def submit(self, function, *args, block=False):
+        """Queue work, returning False if the backlog is full
+
+        With block=True, wait for room instead; the work is always queued.
+        """
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, daemon=True)
+            self._worker.start()
+        try:
+            self.tasks.put((function, args), block=block)
+        except queue.Full:
+            return False
+        return True
+
+    def idle(self):
+        """Whether every submitted task has finished running"""
+        with self.tasks.mutex:
+            return self.tasks.unfinished_tasks == 0
+
+    def _run(self):
+        while True:
+            function, args = self.tasks.get()
+            try:
+                function(*args)
+            except Exception as error:
+                print(f"Deferred learning failed: {error}")
+            finally:
+                self.tasks.task_done()
+
+    def drain(self):
+        """Block until all queued work has run"""
+        self.tasks.join()
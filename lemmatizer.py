@@ -0,0 +1,73 @@
+import functools
+import nltk
+from nltk.corpus import wordnet
+from nltk.stem import WordNetLemmatizer
+try:
+    nltk.data.find('corpora/wordnet')
+except LookupError:
+    nltk.download('wordnet')
+
+# WordNet parts of speech tried in order: noun, verb, adjective
+LEMMA_POS = ('n', 'v', 'a')
+
+_wordnet = WordNetLemmatizer()
+_available = True
+
+
+@functools.lru_cache(maxsize=50000)
+def lemmatize(token, pos):
+    """WordNet lemma of a (token, POS) pair, memoized for the whole process"""
+    global _available
+    if not _available:
+        return token
+    try:
+        return _wordnet.lemmatize(token, pos)
+    except LookupError:
+        # WordNet data is missing; fall back to exact matching
+        _available = False
+        return token
+
+
+@functools.lru_cache(maxsize=50000)
+def is_known_word(token):
+    """Whether WordNet knows the token or one of its inflections"""
+    global _available
+    if not _available:
+        return False
+    try:
+        return bool(wordnet.synsets(token))
+    except LookupError:
+        _available = False
+        return False
+
+
+class LemmaNormalizer:
+    """Maps inflected words onto a lexicon vocabulary via their lemmas
+
+    The lemma table for the vocabulary is built up front, so a word that
+    is already in the vocabulary never reaches WordNet, and every other
+    word costs at most one lookup per POS for the life of the process.
+    """
+
+    def __init__(self, vocabulary):
+        self.vocabulary = set(vocabulary)
+        self.lemma_table = {}
+        for word in vocabulary:
+            for pos in LEMMA_POS:
+                self.lemma_table.setdefault(lemmatize(word, pos), word)
+        for word in vocabulary:
+            self.lemma_table[word] = word
+
+    def normalize(self, token):
+        """The vocabulary word sharing this token's lemma, or the token itself"""
+        if token in self.vocabulary:
+            return token
+        for pos in LEMMA_POS:
+            word = self.lemma_table.get(lemmatize(token, pos))
+            if word is not None:
+                return word
+        return token
+
+    @staticmethod
+    def cache_info():
+        return lemmatize.cache_info()
@@ -0,0 +1,139 @@
+import json
+import numpy as np
+
+# Default sentiment lexicon, matching the chatbot's original word lists
+POSITIVE_WORDS = ['happy', 'good', 'great', 'awesome', 'excellent', 'love', 'wonderful']
+NEGATIVE_WORDS = ['sad', 'bad', 'terrible', 'awful', 'hate', 'dislike', 'wrong']
+
+
+def default_sentiment_weights():
+    """Sentiment weights for the default word lists"""
+    weights = {word: -0.1 for word in NEGATIVE_WORDS}
+    weights.update({word: 0.1 for word in POSITIVE_WORDS})
+    return weights
+
+
+def topic_weights_from_knowledge_base(knowledge_base):
+    """Topic lexicon where a category and each of its subtopics count once"""
+    topic_weights = {}
+    for category, subtopics in knowledge_base.items():
+        words = {category: 1.0}
+        words.update({topic: 1.0 for topic in subtopics})
+        topic_weights[category] = words
+    return topic_weights
+
+
+class LexiconEngine:
+    """Scores sentiment and topic affinity from a fixed, weighted vocabulary
+
+    The vocabulary is mapped to weight vectors once, so single messages
+    only need dictionary lookups and batches of messages are scored with
+    NumPy bincount operations.
+    """
+
+    def __init__(self, sentiment_weights, topic_weights):
+        self.topics = list(topic_weights)
+        self.vocabulary = {}
+        for word in sentiment_weights:
+            self.vocabulary.setdefault(word, len(self.vocabulary))
+        for words in topic_weights.values():
+            for word in words:
+                self.vocabulary.setdefault(word, len(self.vocabulary))
+
+        self.sentiment_vector = np.zeros(len(self.vocabulary))
+        for word, weight in sentiment_weights.items():
+            self.sentiment_vector[self.vocabulary[word]] = weight
+
+        self.topic_matrix = np.zeros((len(self.vocabulary), len(self.topics)))
+        for column, topic in enumerate(self.topics):
+            for word, weight in topic_weights[topic].items():
+                self.topic_matrix[self.vocabulary[word], column] = weight
+
+        # Plain dict views for scoring one message without NumPy overhead
+        self.sentiment_weights = {
+            word: weight for word, weight in sentiment_weights.items() if weight
+        }
+        self.word_topics = {}
+        for word, row in self.vocabulary.items():
+            columns = np.flatnonzero(self.topic_matrix[row])
+            if len(columns):
+                self.word_topics[word] = [
+                    (column, self.topic_matrix[row, column]) for column in columns.tolist()
+                ]
+
+    @classmethod
+    def from_file(cls, path, knowledge_base=None):
+        """Load a weighted lexicon from a JSON file
+
+        The file holds {"sentiment": {word: weight}, "topics": {topic: {word: weight}}}.
+        Sections that are missing fall back to the default word lists and,
+        if given, the knowledge base.
+        """
+        with open(path, 'r') as f:
+            data = json.load(f)
+        sentiment_weights = data.get('sentiment') or default_sentiment_weights()
+        topic_weights = data.get('topics')
+        if topic_weights is None:
+            topic_weights = topic_weights_from_knowledge_base(knowledge_base or {})
+        return cls(sentiment_weights, topic_weights)
+
+    def sentiment(self, words):
+        """Sentiment of one message, clipped to [-1, 1]"""
+        score = 0.0
+        for word in words:
+            weight = self.sentiment_weights.get(word)
+            if weight is not None:
+                score += weight
+        return max(-1.0, min(1.0, score))
+
+    def topics_for(self, words):
+        """Topics whose summed weight for one message is positive, in lexicon order"""
+        affinities = {}
+        for word in words:
+            for column, weight in self.word_topics.get(word, ()):
+                affinities[column] = affinities.get(column, 0.0) + weight
+        return [self.topics[column] for column in sorted(affinities) if affinities[column] > 0]
+
+    def _encode(self, messages):
+        """Flatten tokenized messages into vocabulary and message id arrays"""
+        word_ids, message_ids = [], []
+        vocabulary = self.vocabulary
+        for message_id, words in enumerate(messages):
+            for word in words:
+                word_id = vocabulary.get(word)
+                if word_id is not None:
+                    word_ids.append(word_id)
+                    message_ids.append(message_id)
+        return np.array(word_ids, dtype=np.intp), np.array(message_ids, dtype=np.intp)
+
+    def score_batch(self, messages, topic_messages=None):
+        """Score a batch of tokenized messages
+
+        Returns a (sentiments, affinities) pair: sentiments has one clipped
+        score per message and affinities is a messages x topics matrix.
+        Topic affinity is taken from `topic_messages` when the caller
+        tokenizes messages differently for topics than for sentiment.
+        """
+        count = len(messages)
+        word_ids, message_ids = self._encode(messages)
+        if topic_messages is None:
+            topic_ids, topic_message_ids = word_ids, message_ids
+        else:
+            topic_ids, topic_message_ids = self._encode(topic_messages)
+
+        # bincount returns integers when there is nothing to count
+        sentiments = np.bincount(
+            message_ids, weights=self.sentiment_vector[word_ids], minlength=count
+        ).astype(float)
+        np.clip(sentiments, -1.0, 1.0, out=sentiments)
+
+        affinities = np.zeros((count, len(self.topics)))
+        for column in range(len(self.topics)):
+            affinities[:, column] = np.bincount(
+                topic_message_ids, weights=self.topic_matrix[topic_ids, column], minlength=count
+            ).astype(float)
+        return sentiments, affinities
+
+    def topics_from_affinities(self, affinities):
+        """Convert a row of topic affinities into a list of topic names"""
+        return [self.topics[column] for column in np.flatnonzero(affinities > 0)]
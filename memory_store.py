@@ -0,0 +1,242 @@
+import json
+import os
+import sqlite3
+
+
+class ScoreTable(dict):
+    """Score mapping that lazily loads missing keys and remembers what changed"""
+
+    def __init__(self, loader=None):
+        super().__init__()
+        self._loader = loader
+        self.dirty = set()
+
+    def __missing__(self, key):
+        value = self._loader(key) if self._loader else None
+        value = 0.0 if value is None else value
+        dict.__setitem__(self, key, value)
+        return value
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.dirty.add(key)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.dirty.discard(key)
+
+    def pop_changes(self):
+        """Return changed scores since the last call and reset tracking"""
+        changes = {key: self[key] for key in self.dirty if key in self}
+        self.dirty.clear()
+        return changes
+
+
+class MemoryStore:
+    """SQLite-backed incremental storage for what an AIFriend learns about a user"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS preferences (
+            user_id TEXT NOT NULL,
+            word TEXT NOT NULL,
+            score REAL NOT NULL,
+            PRIMARY KEY (user_id, word)
+        );
+        CREATE TABLE IF NOT EXISTS topics (
+            user_id TEXT NOT NULL,
+            topic TEXT NOT NULL,
+            learned REAL NOT NULL DEFAULT 0,
+            expertise REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, topic)
+        );
+        CREATE TABLE IF NOT EXISTS traits (
+            user_id TEXT NOT NULL,
+            trait TEXT NOT NULL,
+            value REAL NOT NULL,
+            PRIMARY KEY (user_id, trait)
+        );
+        CREATE TABLE IF NOT EXISTS meta (
+            user_id TEXT NOT NULL,
+            key TEXT NOT NULL,
+            value TEXT NOT NULL,
+            PRIMARY KEY (user_id, key)
+        );
+        CREATE TABLE IF NOT EXISTS history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            user_input TEXT NOT NULL,
+            topics TEXT NOT NULL,
+            sentiment REAL NOT NULL,
+            timestamp TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_preferences_score ON preferences (user_id, score DESC);
+        CREATE INDEX IF NOT EXISTS idx_history_user ON history (user_id, id);
+    """
+
+    def __init__(self, path, user_id="default", history_limit=100):
+        self.path = path
+        self.user_id = user_id
+        self.history_limit = history_limit
+        # Callers serialize access, so deferred learning may use the connection too
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        # WAL keeps every committed turn durable without rewriting the file
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+
+    def is_empty(self):
+        """Check whether anything has been stored for this user"""
+        for table in ('preferences', 'topics', 'history'):
+            row = self.conn.execute(
+                f"SELECT 1 FROM {table} WHERE user_id = ? LIMIT 1", (self.user_id,)
+            ).fetchone()
+            if row:
+                return False
+        return True
+
+    def get_meta(self, key, default=None):
+        """Fetch a stored bookkeeping value"""
+        row = self.conn.execute(
+            "SELECT value FROM meta WHERE user_id = ? AND key = ?", (self.user_id, key)
+        ).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def top_preferences(self, limit=10):
+        """Fetch the highest scoring preferences"""
+        rows = self.conn.execute(
+            "SELECT word, score FROM preferences WHERE user_id = ? ORDER BY score DESC LIMIT ?",
+            (self.user_id, limit)
+        ).fetchall()
+        return dict(rows)
+
+    def get_topic_score(self, topic, field):
+        """Fetch one topic's 'learned' or 'expertise' score, or None if never stored"""
+        if field not in ('learned', 'expertise'):
+            raise ValueError(f"unknown topic field: {field}")
+        row = self.conn.execute(
+            f"SELECT {field} FROM topics WHERE user_id = ? AND topic = ?",
+            (self.user_id, topic)
+        ).fetchone()
+        return row[0] if row else None
+
+    def load_traits(self):
+        """Load stored personality traits"""
+        rows = self.conn.execute(
+            "SELECT trait, value FROM traits WHERE user_id = ?", (self.user_id,)
+        )
+        return dict(rows.fetchall())
+
+    def recent_history(self, limit=50):
+        """Load the most recent conversation entries, oldest first"""
+        rows = self.conn.execute(
+            "SELECT user_input, topics, sentiment, timestamp FROM history "
+            "WHERE user_id = ? ORDER BY id DESC LIMIT ?",
+            (self.user_id, limit)
+        ).fetchall()
+        return [
+            {
+                'user_input': user_input,
+                'topics': json.loads(topics),
+                'sentiment': sentiment,
+                'timestamp': timestamp
+            }
+            for user_input, topics, sentiment, timestamp in reversed(rows)
+        ]
+
+    def prune_preferences(self, keep):
+        """Delete all but the `keep` highest scoring preferences"""
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM preferences WHERE user_id = ? AND word NOT IN "
+                "(SELECT word FROM preferences WHERE user_id = ? ORDER BY score DESC LIMIT ?)",
+                (self.user_id, self.user_id, keep)
+            )
+
+    def commit(self, preferences=None, learned_topics=None, topic_expertise=None,
+               history=None, traits=None, removed_preferences=None, meta=None):
+        """Write a batch of changes in a single transaction"""
+        preferences = preferences or {}
+        removed_preferences = removed_preferences or ()
+        meta = meta or {}
+        learned_topics = learned_topics or {}
+        topic_expertise = topic_expertise or {}
+        history = history or []
+        traits = traits or {}
+        uid = self.user_id
+
+        with self.conn:
+            if preferences:
+                self.conn.executemany(
+                    "INSERT INTO preferences (user_id, word, score) VALUES (?, ?, ?) "
+                    "ON CONFLICT (user_id, word) DO UPDATE SET score = excluded.score",
+                    [(uid, word, score) for word, score in preferences.items()]
+                )
+            if removed_preferences:
+                self.conn.executemany(
+                    "DELETE FROM preferences WHERE user_id = ? AND word = ?",
+                    [(uid, word) for word in removed_preferences]
+                )
+            if meta:
+                self.conn.executemany(
+                    "INSERT INTO meta (user_id, key, value) VALUES (?, ?, ?) "
+                    "ON CONFLICT (user_id, key) DO UPDATE SET value = excluded.value",
+                    [(uid, key, json.dumps(value)) for key, value in meta.items()]
+                )
+            if learned_topics:
+                self.conn.executemany(
+                    "INSERT INTO topics (user_id, topic, learned) VALUES (?, ?, ?) "
+                    "ON CONFLICT (user_id, topic) DO UPDATE SET learned = excluded.learned",
+                    [(uid, topic, score) for topic, score in learned_topics.items()]
+                )
+            if topic_expertise:
+                self.conn.executemany(
+                    "INSERT INTO topics (user_id, topic, expertise) VALUES (?, ?, ?) "
+                    "ON CONFLICT (user_id, topic) DO UPDATE SET expertise = excluded.expertise",
+                    [(uid, topic, score) for topic, score in topic_expertise.items()]
+                )
+            if traits:
+                self.conn.executemany(
+                    "INSERT INTO traits (user_id, trait, value) VALUES (?, ?, ?) "
+                    "ON CONFLICT (user_id, trait) DO UPDATE SET value = excluded.value",
+                    [(uid, trait, value) for trait, value in traits.items()]
+                )
+            if history:
+                self.conn.executemany(
+                    "INSERT INTO history (user_id, user_input, topics, sentiment, timestamp) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (uid, entry['user_input'], json.dumps(entry['topics']),
+                         entry['sentiment'], entry['timestamp'])
+                        for entry in history
+                    ]
+                )
+                # Keep only the newest entries for this user
+                self.conn.execute(
+                    "DELETE FROM history WHERE user_id = ? AND id <= "
+                    "(SELECT id FROM history WHERE user_id = ? ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                    (uid, uid, self.history_limit)
+                )
+
+    def import_json(self, json_path):
+        """Import a legacy ai_memory.json file into the store"""
+        if not os.path.exists(json_path):
+            return False
+        try:
+            with open(json_path, 'r') as f:
+                memory_data = json.load(f)
+        except json.JSONDecodeError:
+            print("Memory file corrupted, starting fresh.")
+            return False
+
+        self.commit(
+            preferences=memory_data.get('user_preferences', {}),
+            learned_topics=memory_data.get('learned_topics', {}),
+            topic_expertise=memory_data.get('topic_expertise', {}),
+            history=memory_data.get('conversation_history', []),
+            traits=memory_data.get('personality_traits', {})
+        )
+        return True
+
+    def close(self):
+        """Close the database connection"""
+        self.conn.close()
@@ -0,0 +1,67 @@
+from conversation_index import ConversationIndex
+
+
+def entry(n, text, topics=(), hour=0):
+    return {
+        'user_input': text,
+        'topics': list(topics),
+        'sentiment': 0.0,
+        'timestamp': f"2025-01-01T{hour:02d}:00:{n:02d}"
+    }
+
+
+def inputs(entries):
+    return [e['user_input'] for e in entries]
+
+
+def test_eviction_keeps_buffer_and_indexes_bounded():
+    index = ConversationIndex(capacity=3)
+    for n in range(10):
+        index.append(entry(n, f"word{n} shared", topics=[f"topic{n % 2}"], hour=n))
+
+    assert len(index) == 3
+    assert inputs(index) == ['word7 shared', 'word8 shared', 'word9 shared']
+    assert set(index.keyword_index) == {'word7', 'word8', 'word9', 'shared'}
+    assert len(index.keyword_index['shared']) == 3
+    assert sum(len(p) for p in index.topic_index.values()) == 3
+    assert set(index.time_index) == {'2025-01-01T07', '2025-01-01T08', '2025-01-01T09'}
+    assert index.recall(keyword='word2') == []
+
+
+def test_recall_is_most_recent_first_with_limit():
+    index = ConversationIndex(capacity=10)
+    for n in range(5):
+        index.append(entry(n, f"pizza {n}"))
+
+    assert inputs(index.recall(keyword='pizza', limit=2)) == ['pizza 4', 'pizza 3']
+    assert inputs(index.recall(keyword='pizza', limit=10)) == [f"pizza {n}" for n in range(4, -1, -1)]
+
+
+def test_recall_before_excludes_later_turns():
+    index = ConversationIndex(capacity=10)
+    seqs = [index.append(entry(n, f"pizza {n}")) for n in range(5)]
+
+    assert inputs(index.recall(keyword='pizza', before=seqs[3], limit=1)) == ['pizza 2']
+    assert index.recall(keyword='pizza', before=seqs[0]) == []
+
+
+def test_combined_keyword_and_topic_filters():
+    index = ConversationIndex(capacity=10)
+    index.append(entry(0, "i like pizza", topics=['favorites']))
+    index.append(entry(1, "pizza physics", topics=['science']))
+    index.append(entry(2, "more physics", topics=['science'], hour=5))
+
+    assert inputs(index.recall(keyword='pizza', topic='science')) == ['pizza physics']
+    assert inputs(index.recall(keyword='pizza', topic='favorites')) == ['i like pizza']
+    assert inputs(index.recall(topic='science', bucket='2025-01-01T05')) == ['more physics']
+    assert index.recall(keyword='pizza', topic='arts') == []
+    assert index.recall() == []
+
+
+def test_keywords_skip_punctuation_and_fall_back_to_text():
+    index = ConversationIndex(capacity=10)
+    index.append(entry(0, "Hello, World!"))
+    index.append(entry(1, "ignored text"), keywords=['cats', ',', '!'])
+
+    assert set(index.keyword_index) == {'hello', 'world', 'cats'}
+    assert index.last_seq == 1
@@ -0,0 +1,71 @@
+import nltk
+import pytest
+
+from fuzzy_match import DeletionIndex, edit_distance
+
+# Favorites and topic nouns, as the chatbot indexes them
+VOCABULARY = [
+    'favorite', 'favourite', 'best', 'like most',
+    'food', 'movie', 'book', 'color', 'music', 'hobby',
+    'philosophy', 'ethics', 'metaphysics', 'logic', 'epistemology',
+    'technology', 'computers', 'programming', 'internet',
+]
+
+
+def test_edit_distance():
+    assert edit_distance('kitten', 'sitting') == 3
+    assert edit_distance('abcd', 'acbd') == 1
+    assert edit_distance('favurite', 'favourite') == 1
+
+
+@pytest.mark.parametrize('token', ['favurite', 'gavourite', 'favorite'])
+def test_misspelled_favourite_is_corrected(token):
+    assert DeletionIndex(VOCABULARY).lookup(token) in ('favourite', 'favorite')
+
+
+def test_short_real_words_are_not_corrected():
+    index = DeletionIndex(VOCABULARY)
+    assert index.lookup('login') is None
+    assert index.lookup('takes') is None
+
+
+def test_known_words_are_not_corrected():
+    index = DeletionIndex(VOCABULARY, is_known={'programing'}.__contains__)
+    assert index.lookup('programing') is None
+    assert index.lookup('programmimg') == 'programming'
+
+
+def test_max_distance_zero_only_matches_exactly():
+    index = DeletionIndex(VOCABULARY, max_distance=0)
+    assert index.lookup('favurite') is None
+    assert index.lookup('favourite') == 'favourite'
+
+
+def nltk_data_available():
+    try:
+        nltk.data.find('tokenizers/punkt_tab')
+        nltk.data.find('corpora/stopwords')
+    except LookupError:
+        return False
+    return True
+
+
+@pytest.fixture
+def friend(tmp_path):
+    if not nltk_data_available():
+        pytest.skip("NLTK tokenizer and stopword data are not installed")
+    from friend_chatbot import AIFriend
+    return AIFriend(memory_file=str(tmp_path / "ai_memory.db"))
+
+
+@pytest.mark.parametrize('message', ['my favurite food is pizza', 'what is your gavourite food'])
+def test_misspelled_favorites_reach_favorite_intent(friend, message):
+    assert friend.perceive_input(message)['intent'] == 'favorite_food'
+
+
+def test_takes_care_is_not_a_farewell(friend):
+    assert friend.perceive_input('he takes care of me')['intent'] != 'farewell'
+
+
+def test_login_is_not_logic(friend):
+    assert 'philosophy' not in friend.perceive_input('login failed')['topics']
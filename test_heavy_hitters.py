@@ -0,0 +1,111 @@
+import pytest
+
+from heavy_hitters import DecayedSpaceSaving
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_counter(capacity=3, half_life=10.0):
+    clock = Clock()
+    return DecayedSpaceSaving(capacity=capacity, half_life=half_life, clock=clock), clock
+
+
+def test_capacity_must_be_positive():
+    with pytest.raises(ValueError):
+        DecayedSpaceSaving(capacity=0)
+
+
+def test_scores_accumulate_and_missing_items_score_zero():
+    counter, _ = make_counter()
+    counter.add('food', 0.05)
+    counter.add('food', 0.05)
+    assert counter['food'] == pytest.approx(0.1)
+    assert counter['music'] == 0.0
+    assert 'food' in counter and 'music' not in counter
+
+
+def test_newcomer_evicts_minimum_and_inherits_its_score():
+    counter, _ = make_counter(capacity=3)
+    for item, weight in [('a', 3.0), ('b', 2.0), ('c', 1.0)]:
+        counter.add(item, weight)
+
+    assert counter.add('d', 0.5) == 'c'
+    assert len(counter) == 3
+    assert 'c' not in counter
+    assert counter['d'] == pytest.approx(1.5)
+
+    # The newcomer is now the minimum and is evicted next
+    assert counter.add('e', 1.0) == 'd'
+
+
+def test_changes_track_dirty_and_removed_items():
+    counter, _ = make_counter(capacity=2)
+    counter.add('a', 2.0)
+    counter.add('b', 1.0)
+    updated, removed = counter.pop_changes()
+    assert set(updated) == {'a', 'b'} and removed == set()
+
+    counter.add('c', 1.0)
+    updated, removed = counter.pop_changes()
+    assert set(updated) == {'c'} and removed == {'b'}
+    assert counter.pop_changes() == ({}, set())
+
+    # An evicted item that comes back is no longer reported as removed
+    counter.add('d', 5.0)
+    counter.add('c', 5.0)
+    updated, removed = counter.pop_changes()
+    assert removed == {'a'}
+    assert 'c' in updated
+
+
+def test_scores_decay_with_half_life():
+    counter, clock = make_counter(half_life=10.0)
+    counter.add('a', 1.0)
+    clock.now = 10.0
+    assert counter['a'] == pytest.approx(0.5)
+    counter.add('b', 1.0)
+    clock.now = 20.0
+    assert counter['a'] == pytest.approx(0.25)
+    assert counter['b'] == pytest.approx(0.5)
+
+
+def test_rescale_moves_landmark_without_changing_scores():
+    counter, clock = make_counter(half_life=10.0)
+    counter.add('a', 1.0)
+    counter.add('b', 2.0)
+    counter.pop_changes()
+    clock.now = 30.0
+    before = {item: counter[item] for item in ('a', 'b')}
+
+    counter.rescale()
+    assert counter.landmark == 30.0
+    assert {item: counter[item] for item in ('a', 'b')} == pytest.approx(before)
+    assert counter.weights['b'] == pytest.approx(0.25)
+    assert set(counter.pop_changes()[0]) == {'a', 'b'}
+
+
+def test_large_weights_trigger_rescale():
+    counter, clock = make_counter(half_life=1.0)
+    clock.now = 400.0
+    counter.add('a', 1.0)
+    assert counter.landmark == 400.0
+    assert counter['a'] == pytest.approx(1.0)
+
+
+def test_load_restores_saved_landmark_and_keeps_top_capacity():
+    counter, clock = make_counter(capacity=2, half_life=10.0)
+    clock.now = 10.0
+    counter.load({'a': 4.0, 'b': 1.0, 'c': 2.0}, landmark=0.0)
+
+    assert counter.landmark == 0.0
+    assert set(counter.weights) == {'a', 'c'}
+    assert counter['a'] == pytest.approx(2.0)
+
+    # The lowest loaded item is the one evicted next
+    assert counter.add('d', 0.1) == 'c'
@@ -0,0 +1,103 @@
+import threading
+import time
+
+import nltk
+import pytest
+
+from latency_budget import BackgroundLearner, CostEstimator
+
+
+def test_estimate_ignores_a_single_slow_sample():
+    estimator = CostEstimator(window=5)
+    for duration in [200.0, 1.0, 1.0]:
+        estimator.record('perceive_input', duration)
+    assert estimator.estimate('perceive_input') == 1.0
+
+
+def test_unmeasured_stage_always_fits():
+    assert CostEstimator().fits('perceive_input', 0.0)
+
+
+def test_skipped_stage_is_probed_and_recovers():
+    estimator = CostEstimator(window=5, probe_interval=10)
+    estimator.record('perceive_input', 200.0)
+
+    decisions = []
+    for _ in range(30):
+        fits = estimator.fits('perceive_input', 20.0)
+        decisions.append(fits)
+        if fits:
+            # The full path ran; it was fast this time
+            estimator.record('perceive_input', 1.0)
+
+    assert decisions[:9] == [False] * 9
+    assert decisions[9]
+    assert all(decisions[-5:])
+    assert estimator.estimate('perceive_input') == 1.0
+
+
+def test_background_learner_runs_work_in_order():
+    learner = BackgroundLearner(max_pending=1000)
+    results = []
+    for i in range(10):
+        assert learner.submit(results.append, i)
+    learner.drain()
+    assert results == list(range(10))
+
+
+def test_full_backlog_blocks_only_when_asked():
+    learner = BackgroundLearner(max_pending=1)
+    release = threading.Event()
+    results = []
+    assert learner.idle()
+    assert learner.submit(release.wait)
+    # Wait for the worker to take the first task so the queue slot frees up
+    while learner.tasks.qsize():
+        time.sleep(0.001)
+    assert learner.submit(results.append, 1)
+    assert not learner.submit(results.append, 2)
+    assert not learner.idle()
+
+    threading.Timer(0.01, release.set).start()
+    assert learner.submit(results.append, 3, block=True)
+    learner.drain()
+    assert results == [1, 3]
+    assert learner.idle()
+
+
+def nltk_data_available():
+    try:
+        nltk.data.find('tokenizers/punkt_tab')
+        nltk.data.find('corpora/stopwords')
+    except LookupError:
+        return False
+    return True
+
+
+def test_tiny_budget_keeps_history_in_turn_order(tmp_path):
+    if not nltk_data_available():
+        pytest.skip("NLTK tokenizer and stopword data are not installed")
+    from friend_chatbot import AIFriend
+    friend = AIFriend(memory_file=str(tmp_path / "ai_memory.db"), latency_budget_ms=0.05)
+    friend.background_learner = BackgroundLearner(max_pending=2)
+    learn = friend.learn_from_interaction
+
+    def slow_learn(*args, **kwargs):
+        time.sleep(0.002)
+        learn(*args, **kwargs)
+
+    friend.learn_from_interaction = slow_learn
+    # Make the full learning stage look too slow for the budget
+    friend.cost_estimator.record('learn_from_interaction', 100.0)
+
+    messages = [f"I like music number {n}" for n in range(60)]
+    for message in messages:
+        friend.generate_response(message)
+    friend.save_memory()
+
+    assert friend.degradations['deferred_learning'] > 0
+    assert friend.degradations['skipped_preferences'] > 0
+    assert [entry['user_input'] for entry in friend.conversation_history] == messages
+    stored = friend.memory_store.recent_history(limit=len(messages))
+    assert [entry['user_input'] for entry in stored] == messages
+    friend.memory_store.close()
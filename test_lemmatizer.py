@@ -0,0 +1,47 @@
+import nltk
+import pytest
+
+import lemmatizer
+from lemmatizer import LemmaNormalizer
+
+VOCABULARY = ['love', 'hate', 'computers', 'music']
+
+
+def wordnet_available():
+    try:
+        nltk.data.find('corpora/wordnet')
+    except LookupError:
+        return False
+    return True
+
+
+@pytest.fixture
+def clear_caches():
+    # Cached lemmas outlive a single test; start and finish with empty caches
+    lemmatizer.lemmatize.cache_clear()
+    lemmatizer.is_known_word.cache_clear()
+    yield
+    lemmatizer.lemmatize.cache_clear()
+    lemmatizer.is_known_word.cache_clear()
+
+
+@pytest.mark.parametrize('token, expected', [
+    ('loved', 'love'),
+    ('hating', 'hate'),
+    ('computer', 'computers'),
+    ('music', 'music'),
+    ('zebra', 'zebra'),
+])
+def test_inflections_map_onto_vocabulary(clear_caches, token, expected):
+    if not wordnet_available():
+        pytest.skip("NLTK WordNet data is not installed")
+    assert LemmaNormalizer(VOCABULARY).normalize(token) == expected
+
+
+def test_exact_match_fallback_without_wordnet(clear_caches, monkeypatch):
+    monkeypatch.setattr(lemmatizer, '_available', False)
+    normalizer = LemmaNormalizer(VOCABULARY)
+    assert normalizer.normalize('love') == 'love'
+    assert normalizer.normalize('loved') == 'loved'
+    assert normalizer.normalize('computer') == 'computer'
+    assert not lemmatizer.is_known_word('love')
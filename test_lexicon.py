@@ -0,0 +1,85 @@
+import json
+import random
+
+from lexicon import LexiconEngine, default_sentiment_weights
+
+TOPICS = {
+    'science': {'science': 1.0, 'physics': 1.0, 'biology': 1.0},
+    'arts': {'arts': 1.0, 'music': 1.0, 'dance': 1.0},
+}
+
+
+def make_engine():
+    return LexiconEngine(default_sentiment_weights(), TOPICS)
+
+
+def assert_batch_matches_single(engine, messages):
+    sentiments, affinities = engine.score_batch(messages)
+    assert len(sentiments) == len(messages)
+    assert affinities.shape == (len(messages), len(engine.topics))
+    for words, sentiment, affinity in zip(messages, sentiments, affinities):
+        assert sentiment == engine.sentiment(words)
+        assert engine.topics_from_affinities(affinity) == engine.topics_for(words)
+
+
+def test_empty_batch():
+    assert_batch_matches_single(make_engine(), [])
+
+
+def test_batch_without_lexicon_words():
+    assert_batch_matches_single(make_engine(), [['nothing', 'here'], []])
+
+
+def test_batch_matches_single_messages():
+    engine = make_engine()
+    vocabulary = list(engine.vocabulary) + ['unknown', 'words']
+    rng = random.Random(0)
+    messages = [
+        [rng.choice(vocabulary) for _ in range(rng.randint(0, 30))]
+        for _ in range(500)
+    ]
+    assert_batch_matches_single(engine, messages)
+
+
+def test_sentiment_is_clipped():
+    engine = make_engine()
+    assert engine.sentiment(['love'] * 20) == 1.0
+    assert engine.score_batch([['hate'] * 20])[0][0] == -1.0
+
+
+def test_positive_and_negative_words():
+    engine = make_engine()
+    assert engine.sentiment(['happy', 'sad', 'great']) == 0.1 - 0.1 + 0.1
+    assert engine.topics_for(['music', 'physics']) == ['science', 'arts']
+
+
+def test_weighted_lexicon_agrees_between_single_and_batch(tmp_path):
+    path = tmp_path / "lexicon.json"
+    path.write_text(json.dumps({
+        'sentiment': {'good': 0.3, 'meh': -0.05},
+        'topics': {
+            'science': {'physics': 1.0, 'boring': -1.0},
+            'arts': {'music': 0.5, 'noise': -0.25}
+        }
+    }))
+    engine = LexiconEngine.from_file(str(path))
+    messages = [
+        ['physics', 'boring'],
+        ['physics', 'boring', 'physics'],
+        ['music', 'noise'],
+        ['music', 'noise', 'noise', 'noise'],
+        ['good', 'meh', 'boring'],
+    ]
+    assert engine.topics_for(['physics', 'boring']) == []
+    assert engine.topics_for(['physics', 'boring', 'physics']) == ['science']
+    assert engine.topics_for(['music', 'noise']) == ['arts']
+    assert engine.sentiment(['good', 'meh']) == 0.3 - 0.05
+    assert_batch_matches_single(engine, messages)
+
+
+def test_separate_topic_messages():
+    engine = make_engine()
+    sentiments, affinities = engine.score_batch([['love'], []], [['music'], ['physics']])
+    assert list(sentiments) == [0.1, 0.0]
+    assert engine.topics_from_affinities(affinities[0]) == ['arts']
+    assert engine.topics_from_affinities(affinities[1]) == ['science']
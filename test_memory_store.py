@@ -0,0 +1,110 @@
+import os
+
+from memory_store import MemoryStore, ScoreTable
+
+SHIPPED_MEMORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ai_memory.json")
+
+
+def make_store(tmp_path, **kwargs):
+    return MemoryStore(str(tmp_path / "ai_memory.db"), **kwargs)
+
+
+def history_entry(n):
+    return {
+        'user_input': f"message {n}",
+        'topics': ['arts'] if n % 2 else [],
+        'sentiment': 0.1 * n,
+        'timestamp': f"2025-01-01T00:00:{n:02d}"
+    }
+
+
+def test_upsert_overwrites_scores(tmp_path):
+    store = make_store(tmp_path)
+    store.commit(preferences={'food': 0.05, 'music': 0.1})
+    store.commit(preferences={'food': 0.3})
+    assert store.top_preferences() == {'food': 0.3, 'music': 0.1}
+
+    store.commit(learned_topics={'arts': 0.1})
+    store.commit(topic_expertise={'arts': 0.05})
+    store.commit(learned_topics={'arts': 0.2})
+    assert store.get_topic_score('arts', 'learned') == 0.2
+    assert store.get_topic_score('arts', 'expertise') == 0.05
+    assert store.get_topic_score('science', 'learned') is None
+
+
+def test_removed_preferences_are_deleted(tmp_path):
+    store = make_store(tmp_path)
+    store.commit(preferences={'food': 0.05, 'music': 0.1})
+    store.commit(removed_preferences={'food'})
+    assert store.top_preferences() == {'music': 0.1}
+
+
+def test_prune_preferences_keeps_highest(tmp_path):
+    store = make_store(tmp_path)
+    store.commit(preferences={f"word{i}": float(i) for i in range(10)})
+    store.prune_preferences(3)
+    assert store.top_preferences(limit=100) == {'word9': 9.0, 'word8': 8.0, 'word7': 7.0}
+
+
+def test_history_is_trimmed_to_limit(tmp_path):
+    store = make_store(tmp_path, history_limit=5)
+    store.commit(history=[history_entry(n) for n in range(3)])
+    store.commit(history=[history_entry(n) for n in range(3, 8)])
+
+    history = store.recent_history(limit=100)
+    assert [entry['user_input'] for entry in history] == [f"message {n}" for n in range(3, 8)]
+    assert history[-1]['topics'] == ['arts']
+
+
+def test_users_are_kept_apart(tmp_path):
+    path = str(tmp_path / "ai_memory.db")
+    alice = MemoryStore(path, user_id="alice")
+    alice.commit(preferences={'food': 1.0}, history=[history_entry(1)])
+    bob = MemoryStore(path, user_id="bob")
+    assert bob.is_empty()
+    assert bob.top_preferences() == {}
+    assert not alice.is_empty()
+
+
+def test_import_shipped_json(tmp_path):
+    store = make_store(tmp_path)
+    assert store.is_empty()
+    assert store.import_json(SHIPPED_MEMORY)
+
+    assert store.top_preferences(limit=100)['favourite'] == 0.05
+    assert store.get_topic_score('favorites', 'learned') == 0.1
+    assert store.get_topic_score('favorites', 'expertise') == 0.05
+    assert store.load_traits()['empathy'] == 0.85
+    assert [entry['user_input'] for entry in store.recent_history()] == [
+        'Hello, whats up', 'What is your favourite food'
+    ]
+
+
+def test_import_missing_json(tmp_path):
+    assert not make_store(tmp_path).import_json(str(tmp_path / "missing.json"))
+
+
+def test_meta_round_trip(tmp_path):
+    store = make_store(tmp_path)
+    assert store.get_meta('preference_landmark', 0.0) == 0.0
+    store.commit(meta={'preference_landmark': 12.5})
+    assert store.get_meta('preference_landmark') == 12.5
+
+
+def test_score_table_loads_lazily_and_tracks_changes(tmp_path):
+    store = make_store(tmp_path)
+    store.commit(learned_topics={'arts': 0.4})
+    lookups = []
+
+    def loader(topic):
+        lookups.append(topic)
+        return store.get_topic_score(topic, 'learned')
+
+    table = ScoreTable(loader=loader)
+    assert lookups == []
+    table['arts'] += 0.1
+    table['science'] += 0.1
+    assert table['arts'] == 0.5
+    assert lookups == ['arts', 'science']
+    assert table.pop_changes() == {'arts': 0.5, 'science': 0.1}
+    assert table.pop_changes() == {}
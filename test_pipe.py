@@ -0,0 +1,89 @@
+import io
+import json
+
+import pytest
+
+import friend_chatbot
+from friend_chatbot import read_messages, respond_stream
+from tracing import NULL_TRACER
+
+
+class StubFriend:
+    """Stands in for AIFriend so the pipe plumbing can be tested without NLTK data"""
+
+    def __init__(self, latency_budget_ms=None, tracer=None):
+        self.tracer = tracer or NULL_TRACER
+        self.autoflush = True
+        self.messages = []
+        self.saves = 0
+
+    def generate_response(self, message):
+        self.messages.append(message)
+        return message.upper()
+
+    def update_goals(self):
+        pass
+
+    def save_memory(self):
+        self.saves += 1
+
+
+def test_read_messages_text_skips_blank_lines():
+    stream = io.StringIO("hello\n\n  \nhow are you\n")
+    assert list(read_messages(stream)) == [{'message': 'hello'}, {'message': 'how are you'}]
+
+
+def test_read_messages_jsonl_flags_bad_lines():
+    stream = io.StringIO('{"message": "hi", "id": 1}\n"plain"\n[1, 2]\n{not json\n')
+    assert list(read_messages(stream, 'jsonl')) == [
+        {'message': 'hi', 'id': 1},
+        {'message': 'plain'},
+        {'error': 'expected object', 'line': '[1, 2]'},
+        {'error': 'invalid JSON', 'line': '{not json'},
+    ]
+
+
+def test_respond_stream_passes_through_unanswerable_records():
+    friend = StubFriend()
+    records = [{'message': 'hi'}, {'message': 42}, {'error': 'invalid JSON'}, {'text': 'yo'}]
+    results = list(respond_stream(friend, records))
+    assert [response for _, response in results] == ['HI', None, None, 'YO']
+    assert friend.messages == ['hi', 'yo']
+
+
+def test_respond_stream_rejects_checkpoint_below_one():
+    with pytest.raises(ValueError):
+        list(respond_stream(StubFriend(), [{'message': 'hi'}], checkpoint_every=0))
+
+
+def test_respond_stream_checkpoints_every_n_messages():
+    friend = StubFriend()
+    records = [{'message': str(n)} for n in range(7)] + [{'message': None}]
+    list(respond_stream(friend, records, checkpoint_every=3))
+    assert friend.saves == 2
+
+
+def test_pipe_jsonl_round_trip(monkeypatch):
+    friends = []
+
+    def make_friend(**kwargs):
+        friends.append(StubFriend(**kwargs))
+        return friends[-1]
+
+    monkeypatch.setattr(friend_chatbot, 'AIFriend', make_friend)
+    monkeypatch.setattr('sys.stdin', io.StringIO('{"message": "hi"}\n{"message": 1}\nnope\n'))
+    output = io.StringIO()
+    monkeypatch.setattr('sys.stdout', output)
+
+    friend_chatbot.pipe(fmt='jsonl', checkpoint_every=1)
+
+    lines = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert lines == [
+        {'message': 'hi', 'response': 'HI'},
+        {'message': 1, 'error': 'missing message'},
+        {'error': 'invalid JSON', 'line': 'nope'},
+    ]
+    friend, = friends
+    assert friend.autoflush is False
+    # One checkpoint for the answered message and a final save on exit
+    assert friend.saves == 2
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+from tracing import NULL_TRACER, LatencyHistogram, Tracer
+
+
+def test_percentile_uses_bucket_upper_bounds():
+    histogram = LatencyHistogram(bounds=[1, 10])
+    assert histogram.percentile(0.5) == 0.0
+
+    # A value equal to a bound falls in that bound's bucket
+    histogram.record(1)
+    assert histogram.percentile(0.5) == 1
+    histogram.record(1.5)
+    assert histogram.percentile(0.5) == 1
+    assert histogram.percentile(1.0) == 10
+
+
+def test_percentile_in_open_bucket_reports_max():
+    histogram = LatencyHistogram(bounds=[1, 10])
+    histogram.record(0.5)
+    histogram.record(42.0)
+    assert histogram.counts == [1, 0, 1]
+    assert histogram.percentile(0.99) == 42.0
+    assert histogram.to_dict()['buckets'] == {'1': 1, '10': 0, 'inf': 1}
+
+
+def test_trace_records_spans_and_errors():
+    tracer = Tracer()
+    finished = []
+    tracer.finish = finished.append
+
+    with pytest.raises(KeyError):
+        with tracer.trace('generate_response', intent='greeting') as trace:
+            with trace.span('perceive_input', words=3):
+                pass
+            with trace.span('select_response'):
+                raise KeyError('missing')
+
+    record, = finished
+    assert record['error'] == 'KeyError'
+    assert record['attributes'] == {'intent': 'greeting'}
+    first, second = record['spans']
+    assert first['name'] == 'perceive_input'
+    assert first['attributes'] == {'words': 3}
+    assert 'error' not in first
+    assert second['error'] == 'KeyError'
+    assert 'attributes' not in second
+
+
+def test_close_writes_spans_and_summary(tmp_path):
+    sink = tmp_path / "trace.jsonl"
+    tracer = Tracer(str(sink))
+    for _ in range(3):
+        with tracer.trace('generate_response', intent='greeting') as trace:
+            with trace.span('perceive_input'):
+                pass
+    tracer.close()
+
+    lines = sink.read_text().splitlines()
+    assert len(lines) == 3
+    summary = json.loads((tmp_path / "trace.jsonl.summary.json").read_text())
+    assert summary['greeting']['total']['count'] == 3
+    assert summary['greeting']['perceive_input']['count'] == 3
+
+
+def test_null_tracer_is_a_no_op():
+    with NULL_TRACER.trace('generate_response', intent='greeting') as trace:
+        with trace.span('perceive_input', words=1) as span:
+            span.set(cached=True)
+        trace.set(degraded=[])
+    assert NULL_TRACER.summary() == {}
+    NULL_TRACER.close()
+
+    with pytest.raises(ValueError):
+        with NULL_TRACER.trace('generate_response'):
+            raise ValueError
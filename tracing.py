@@ -0,0 +1,201 @@
+import bisect
+import json
+import time
+
+# Histogram bucket upper bounds in milliseconds; the last bucket is open ended
+BUCKET_BOUNDS_MS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000]
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram"""
+
+    def __init__(self, bounds=BUCKET_BOUNDS_MS):
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, duration_ms):
+        self.counts[bisect.bisect_left(self.bounds, duration_ms)] += 1
+        self.total += 1
+        self.sum_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given percentile"""
+        if not self.total:
+            return 0.0
+        target = fraction * self.total
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return self.bounds[index] if index < len(self.bounds) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self):
+        return {
+            'count': self.total,
+            'mean_ms': self.sum_ms / self.total if self.total else 0.0,
+            'p50_ms': self.percentile(0.50),
+            'p99_ms': self.percentile(0.99),
+            'max_ms': self.max_ms,
+            'buckets': dict(zip([str(b) for b in self.bounds] + ['inf'], self.counts))
+        }
+
+
+class Span:
+    """A timed stage within a trace"""
+
+    def __init__(self, trace, name, attributes):
+        self.trace = trace
+        self.name = name
+        self.attributes = attributes
+        self.start = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        record = {
+            'name': self.name,
+            'offset_ms': (self.start - self.trace.start) * 1000,
+            'duration_ms': (end - self.start) * 1000
+        }
+        if self.attributes:
+            record['attributes'] = self.attributes
+        if exc_type is not None:
+            record['error'] = exc_type.__name__
+        self.trace.spans.append(record)
+        return False
+
+
+class Trace:
+    """All spans recorded while handling one request"""
+
+    def __init__(self, tracer, name, attributes):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.spans = []
+        self.start = None
+        self.timestamp = None
+
+    def span(self, name, **attributes):
+        return Span(self, name, attributes)
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def __enter__(self):
+        self.timestamp = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration_ms = (time.perf_counter() - self.start) * 1000
+        record = {
+            'name': self.name,
+            'timestamp': self.timestamp,
+            'duration_ms': duration_ms,
+            'attributes': self.attributes,
+            'spans': self.spans
+        }
+        if exc_type is not None:
+            record['error'] = exc_type.__name__
+        self.tracer.finish(record)
+        return False
+
+
+class NullTrace:
+    """Stand-in used when tracing is disabled; every operation is a no-op"""
+
+    def span(self, name, **attributes):
+        return self
+
+    def set(self, **attributes):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class NullTracer:
+    """Tracer that records nothing"""
+
+    enabled = False
+    _trace = NullTrace()
+
+    def trace(self, name, **attributes):
+        return self._trace
+
+    def summary(self):
+        return {}
+
+    def close(self):
+        pass
+
+
+class Tracer:
+    """Records per-stage spans, exports them as JSONL and keeps per-intent histograms
+
+    The histogram summary is written to `<sink_path>.summary.json` on close.
+    """
+
+    enabled = True
+
+    def __init__(self, sink_path=None):
+        self.sink_path = sink_path
+        self._sink = None
+        self.histograms = {}
+
+    def trace(self, name, **attributes):
+        return Trace(self, name, attributes)
+
+    def _histogram(self, intent, stage):
+        stages = self.histograms.setdefault(intent, {})
+        if stage not in stages:
+            stages[stage] = LatencyHistogram()
+        return stages[stage]
+
+    def finish(self, record):
+        """Aggregate a finished trace and write it to the sink"""
+        intent = record['attributes'].get('intent', 'unknown')
+        self._histogram(intent, 'total').record(record['duration_ms'])
+        for span in record['spans']:
+            self._histogram(intent, span['name']).record(span['duration_ms'])
+
+        if self.sink_path:
+            if self._sink is None:
+                self._sink = open(self.sink_path, 'a')
+            self._sink.write(json.dumps(record) + '\n')
+            # Flush per trace so spans survive the process being killed
+            self._sink.flush()
+
+    def summary(self):
+        """Latency histograms grouped by intent and stage"""
+        return {
+            intent: {stage: histogram.to_dict() for stage, histogram in stages.items()}
+            for intent, stages in self.histograms.items()
+        }
+
+    def close(self):
+        """Close the sink and write the histogram summary next to it"""
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+        if self.sink_path and self.histograms:
+            with open(self.sink_path + '.summary.json', 'w') as f:
+                json.dump(self.summary(), f, indent=2)
+
+
+NULL_TRACER = NullTracer()